@@ -2,236 +2,707 @@
 # Optimized for better documentation generation without UML support
 
 import os
+import re
+import ast
 import json
-from typing import Dict, List
-from crewai import Agent, Task, Crew, Process
-from langchain_openai import ChatOpenAI
-from crewai.tools import BaseTool
-from crewai_tools import DirectoryReadTool, FileReadTool
+import time
+import asyncio
+import itertools
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
+# crewai, crewai_tools and openai pull in hundreds of modules, so
+# they are only imported inside the build_* factories below. Importing this
+# module (tests, introspection) stays fast; the cost is paid on first run.
+if TYPE_CHECKING:
+    from crewai import Crew
+    from crewai.tools import BaseTool
+
 # Load environment variables
 load_dotenv()
 
-# Initialize LLMs with optimized temperatures
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
-analyzer_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)  # Lower temp for analysis
+# BATCH_MODE=1 sends per-file code analysis through the OpenAI Batch API
+# (half price, but results may take minutes to hours)
+BATCH_MODE = os.getenv("BATCH_MODE") == "1"
+
+# Requests per minute allowed for the whole pipeline. Every crew has its own
+# agent instances, so each crew's max_rpm applies; the two analysis crews run
+# at the same time and each of them gets half of the budget.
+LLM_MAX_RPM = int(os.getenv("LLM_MAX_RPM", "100"))
+_ANALYSIS_MAX_RPM = max(1, LLM_MAX_RPM // 2)
 
 # --- ENHANCED TOOLS ---
 
-class FileWriteTool(BaseTool):
-    name: str = "File Writer"
-    description: str = "Writes given text content to a specified file with proper formatting."
+# Directories already created by FileWriteTool during this run
+_ENSURED_DIRS: set = set()
 
-    def _run(self, file_path: str, content: str) -> str:
-        """
-        Writes content to a specified file with error handling.
-        """
+# Content last written by FileWriteTool in this run, keyed by absolute path
+_WRITTEN_FILES: Dict[str, str] = {}
+
+# FileReadTool results keyed by (path, mtime_ns, size, start_line, line_count)
+_FILE_READ_CACHE: Dict[tuple, str] = {}
+
+# (name, path) of every file below a scanned directory, filled by
+# scan_project() and shared by the directory and batch tools
+_PROJECT_ENTRIES: Dict[str, List[Tuple[str, str]]] = {}
+
+def scan_project(directory: str) -> List[Tuple[str, str]]:
+    """
+    Lists all files below a directory in one os.scandir sweep and caches the result.
+    """
+    directory = os.path.normpath(directory)
+    entries = []
+    pending = [directory]
+    while pending:
+        current = pending.pop()
         try:
-            output_dir = os.path.dirname(file_path)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
-            return f"File '{file_path}' successfully written with {len(content)} characters."
-        except IOError as e:
-            return f"Error writing file '{file_path}': {e}"
-
-class CodeAnalyzerTool(BaseTool):
-    name: str = "Code Analyzer"
-    description: str = "Analyzes code files to extract functions, classes, dependencies, and patterns."
+            it = os.scandir(current)
+        except OSError:
+            # Like os.walk, skip subdirectories that cannot be listed; an
+            # unusable root directory is reported to the caller
+            if current == directory:
+                raise
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file():
+                    entries.append((entry.name, entry.path))
+    entries.sort(key=lambda e: e[1])
+    _PROJECT_ENTRIES[directory] = entries
+    return entries
+
+def project_entries(directory: str) -> List[Tuple[str, str]]:
+    """
+    Returns the cached file listing of a directory, scanning it on first use.
+    """
+    cached = _PROJECT_ENTRIES.get(os.path.normpath(directory))
+    return cached if cached is not None else scan_project(directory)
+
+# Precompiled patterns for non-Python files, matched directly on the raw bytes
+_IMPORT_RE = re.compile(rb'^[ \t]*((?:import |from |require|include).*)$', re.M)
+_CLASS_RE = re.compile(rb'\bclass\s')
+_FUNCTION_RE = re.compile(rb'\b(?:def|function)\s')
+
+def _analyze_python(data: bytes) -> Dict:
+    """
+    Extracts classes, functions and imports from Python source in one AST walk.
+    """
+    tree = ast.parse(data)
+    has_classes = has_functions = False
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            has_classes = True
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            has_functions = True
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            imports.append((node.lineno, ast.unparse(node)))
+    return {
+        "has_classes": has_classes,
+        "has_functions": has_functions,
+        "imports": [statement for _, statement in sorted(imports)]
+    }
+
+def _analyze_text(data: bytes) -> Dict:
+    """
+    Regex-based analysis for any language the AST path cannot handle.
+    """
+    return {
+        "has_classes": _CLASS_RE.search(data) is not None,
+        "has_functions": _FUNCTION_RE.search(data) is not None,
+        "imports": [m.group(1).decode('utf-8', errors='replace').strip() for m in _IMPORT_RE.finditer(data)]
+    }
+
+def _analyze_file(file_path: str) -> Dict:
+    """
+    Reads a file once and builds the analysis report for it.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    file_type = os.path.splitext(file_path)[1]
+    details = None
+    if file_type == '.py':
+        try:
+            details = _analyze_python(data)
+        except (SyntaxError, ValueError):
+            pass  # Fall back to the regex scan for files that do not parse
+    if details is None:
+        details = _analyze_text(data)
+
+    return {
+        "file": file_path,
+        "lines": data.count(b'\n') + 1,
+        **details,
+        "file_type": file_type
+    }
+
+def _read_text(file_path: str, start_line: int = 1, line_count: Optional[int] = None) -> str:
+    """
+    Reads a file as UTF-8 with LF line endings, so identical files always give
+    byte-identical tool output regardless of platform locale.
+    """
+    if start_line < 1 or (line_count is not None and line_count < 0):
+        raise ValueError(f"invalid line range start_line={start_line}, line_count={line_count}")
+    # Text mode already translates \r\n and \r to \n
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        if start_line <= 1 and line_count is None:
+            return f.read()
+        start = start_line - 1
+        stop = None if line_count is None else start + line_count
+        return "".join(itertools.islice(f, start, stop))
+
+def _run_concurrently(func, items: List[str]) -> List[str]:
+    """
+    Calls func for every item on a thread pool so blocking reads overlap; results keep input order.
+    """
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(items))) as executor:
+        return list(executor.map(func, items))
+
+@lru_cache(maxsize=256)
+def _analyze_cached(file_path: str, mtime_ns: int, size: int) -> str:
+    """
+    Memoized analysis report; mtime and size invalidate the entry on change.
+    The report is compact JSON, since indentation only costs the LLM tokens.
+    """
+    return orjson.dumps(_analyze_file(file_path)).decode()
+
+# File extensions picked up by the batch analyzer
+_CODE_EXTENSIONS = {'.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.go', '.rb', '.rs', '.c', '.h', '.cpp', '.cs', '.php'}
+
+ANALYZER_SYSTEM_PROMPT = (
+    "You are a senior software architect. Summarize the given source file: its purpose, "
+    "key classes and functions, imports and dependencies, and notable design patterns."
+)
+
+def _batch_record_text(record: Dict) -> str:
+    """
+    Returns the completion text of one Batch API result line, or an error message.
+    """
+    response = record.get("response") or {}
+    body = response.get("body") or {}
+    status_code = response.get("status_code")
+    error = record.get("error") or body.get("error")
+    if error or status_code != 200:
+        message = error.get("message", error) if isinstance(error, dict) else error
+        return f"Error: request failed with status {status_code}: {message}"
+    choices = body.get("choices") or [{}]
+    return choices[0].get("message", {}).get("content") or ""
+
+def _iter_code_files(directory: str):
+    """
+    Yields code file paths below a directory, skipping hidden entries.
+    """
+    for name, path in project_entries(directory):
+        relative_parts = os.path.relpath(path, directory).split(os.sep)
+        if os.path.splitext(name)[1] in _CODE_EXTENSIONS and not any(p.startswith('.') for p in relative_parts):
+            yield path
+
+# Sections a README must have for the review pass to be skipped
+REQUIRED_README_SECTIONS = ("features", "installation", "usage", "project structure")
+
+# ATX markdown heading; comments like "# install" only count outside code fences
+_HEADING_RE = re.compile(r'^#{1,6}[ \t]+(.*?)[ \t#]*$')
+_FENCE_RE = re.compile(r'^[ \t]{0,3}(```|~~~)')
+
+def needs_review(readme_text: str) -> bool:
+    """
+    Deterministic pre-check: True unless every required section has a heading.
+    """
+    headings = []
+    fence = None
+    for line in readme_text.splitlines():
+        fence_match = _FENCE_RE.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            fence = marker if fence is None else (None if marker == fence else fence)
+        elif fence is None:
+            heading_match = _HEADING_RE.match(line)
+            if heading_match:
+                headings.append(heading_match.group(1).lower())
+    return not all(any(section in heading for heading in headings) for section in REQUIRED_README_SECTIONS)
+
+def build_tools() -> Dict[str, "BaseTool"]:
+    """
+    Defines the custom tools and returns one instance of each tool by name.
+    """
+    from crewai.tools import BaseTool
+    from crewai_tools import FileReadTool
+    from openai import OpenAI
+
+    class PrecomputedDirectoryTool(BaseTool):
+        name: str = "List files in directory"
+        description: str = "Recursively lists all file paths in a directory."
+
+        def _run(self, directory: str) -> str:
+            """
+            Returns the listing from the startup scan instead of walking the directory again.
+            """
+            try:
+                entries = project_entries(directory)
+            except OSError as e:
+                return f"Error listing directory '{directory}': {e}"
+            return "File paths: \n- " + "\n- ".join(path for _, path in entries)
+
+    class FileWriteTool(BaseTool):
+        name: str = "File Writer"
+        description: str = "Writes given text content to a specified file with proper formatting."
+
+        def _run(self, file_path: str, content: str) -> str:
+            """
+            Writes content to a specified file with error handling.
+            """
+            try:
+                output_dir = os.path.dirname(file_path)
+                if output_dir and output_dir not in _ENSURED_DIRS:
+                    os.makedirs(output_dir, exist_ok=True)
+                    _ENSURED_DIRS.add(output_dir)
+
+                Path(file_path).write_text(content, encoding="utf-8")
+                _WRITTEN_FILES[os.path.abspath(file_path)] = content
+                _PROJECT_ENTRIES.clear()  # New file: cached listings are outdated
+                return f"File '{file_path}' successfully written with {len(content)} characters."
+            except IOError as e:
+                return f"Error writing file '{file_path}': {e}"
+
+    class CodeAnalyzerTool(BaseTool):
+        name: str = "Code Analyzer"
+        description: str = "Analyzes code files to extract functions, classes, dependencies, and patterns."
     
-    def _run(self, file_path: str) -> str:
+        def _run(self, file_path: str) -> str:
+            """
+            Performs basic code analysis on a file.
+            """
+            try:
+                stat = os.stat(file_path)
+                return _analyze_cached(file_path, stat.st_mtime_ns, stat.st_size)
+            except Exception as e:
+                return f"Error analyzing {file_path}: {e}"
+
+        def _run_many(self, file_paths: List[str]) -> Dict[str, str]:
+            """
+            Analyzes several files on a thread pool so their disk reads overlap.
+            """
+            return dict(zip(file_paths, _run_concurrently(self._run, file_paths)))
+
+    class MultiFileAnalyzerTool(BaseTool):
+        name: str = "Multi-File Code Analyzer"
+        description: str = "Analyzes a list of code files in one call. Pass all file paths at once instead of calling Code Analyzer per file."
+
+        def _run(self, file_paths: List[str]) -> str:
+            """
+            Runs the code analysis for every file concurrently and merges the reports.
+            """
+            return "\n\n".join(code_analyzer_tool._run_many(file_paths).values())
+
+    class CachedFileReadTool(FileReadTool):
         """
-        Performs basic code analysis on a file.
+        FileReadTool that always decodes UTF-8 and returns repeated reads of an
+        unchanged file from memory.
         """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Basic analysis
-            lines = content.split('\n')
-            analysis = {
-                "file": file_path,
-                "lines": len(lines),
-                "has_classes": 'class ' in content,
-                "has_functions": 'def ' in content or 'function ' in content,
-                "imports": [l.strip() for l in lines if l.strip().startswith(('import ', 'from ', 'require', 'include'))],
-                "file_type": os.path.splitext(file_path)[1]
-            }
-            
-            return json.dumps(analysis, indent=2)
-        except Exception as e:
-            return f"Error analyzing {file_path}: {e}"
-
-# Instantiate tools
-directory_tool = DirectoryReadTool()
-file_tool = FileReadTool()
-file_write_tool = FileWriteTool()
-code_analyzer_tool = CodeAnalyzerTool()
-
-# --- ENHANCED AGENT DEFINITIONS ---
-
-# 1. Project Navigator - Enhanced with better exploration strategy
-navigator_agent = Agent(
-    role='Senior Project Navigator',
-    goal='Create a comprehensive map of the project structure, identifying all files, directories, and their relationships.',
-    backstory="""You are an experienced code explorer with 10+ years analyzing codebases. 
-    You excel at understanding project layouts, identifying entry points, configuration files, 
-    and creating clear mental models of how projects are organized. You always provide 
-    structured, hierarchical views of project directories.""",
-    verbose=True,
-    allow_delegation=False,
-    tools=[directory_tool, file_tool],
-    llm=llm,
-    max_iter=5
-)
 
-# 2. Code Analyzer - New agent for deeper code understanding
-code_analyzer_agent = Agent(
-    role='Code Analysis Specialist',
-    goal='Analyze code files to understand functionality, dependencies, patterns, and architecture.',
-    backstory="""You are a senior software architect who specializes in reverse-engineering codebases. 
-    You can identify design patterns, understand dependencies, detect code smells, and explain 
-    complex logic in simple terms. You focus on understanding the 'why' behind code structures.""",
-    verbose=True,
-    allow_delegation=False,
-    tools=[file_tool, code_analyzer_tool],
-    llm=analyzer_llm,
-    max_iter=5
-)
+        def _run(self, file_path: Optional[str] = None, start_line: Optional[int] = 1,
+                 line_count: Optional[int] = None) -> str:
+            file_path = file_path or self.file_path
+            # Same defaults as FileReadTool: 0 or None reads from the first line to the end
+            start_line = start_line or 1
+            line_count = line_count or None
+            try:
+                stat = os.stat(file_path)
+            except (OSError, TypeError):
+                # Let FileReadTool report missing or invalid paths as usual
+                return super()._run(file_path=file_path, start_line=start_line, line_count=line_count)
 
-# 3. Technical Writer - Enhanced with better documentation skills
-writer_agent = Agent(
-    role='Senior Technical Documentation Expert',
-    goal='Create comprehensive, well-structured README.md documentation that is both informative and easy to understand.',
-    backstory="""You are a technical writer with expertise in creating developer documentation. 
-    You know how to structure README files with proper sections including: Project Overview, 
-    Features, Installation, Usage, Project Structure, Configuration, API Documentation, 
-    Contributing Guidelines, and License. You use markdown effectively with code blocks, 
-    tables, and clear formatting. You always ensure documentation is actionable and helpful.""",
-    verbose=True,
-    allow_delegation=False,
-    tools=[file_write_tool],
-    llm=llm,
-    max_iter=3
-)
+            key = (file_path, stat.st_mtime_ns, stat.st_size, start_line, line_count)
+            if key not in _FILE_READ_CACHE:
+                try:
+                    content = _read_text(file_path, start_line, line_count)
+                except (OSError, ValueError) as e:
+                    return f"Error: Failed to read file {file_path}. {e}"
+                if not content and start_line > 1:
+                    return f"Error: Start line {start_line} exceeds the number of lines in the file."
+                _FILE_READ_CACHE[key] = content
+            return _FILE_READ_CACHE[key]
 
-# 4. Documentation Reviewer - New agent for quality assurance
-reviewer_agent = Agent(
-    role='Documentation Quality Reviewer',
-    goal='Review and enhance documentation for completeness, clarity, and technical accuracy.',
-    backstory="""You are a senior developer who reviews documentation for open-source projects. 
-    You ensure documentation is complete, accurate, follows best practices, and includes 
-    all necessary sections. You check for missing information, unclear explanations, 
-    and suggest improvements for better developer experience.""",
-    verbose=True,
-    allow_delegation=False,
-    tools=[file_tool, file_write_tool],
-    llm=llm,
-    max_iter=2
-)
+    class BatchCodeAnalyzerTool(BaseTool):
+        name: str = "Batch Code Analyzer"
+        description: str = "Analyzes all code files of a project directory in one OpenAI batch job and returns a summary per file."
+        model: str = "gpt-4o-mini"
+        temperature: float = 0.3
+        max_poll_interval: int = 60
 
-# --- ENHANCED TASK DEFINITIONS ---
-
-# Task 1: Project Structure Analysis
-structure_analysis_task = Task(
-    description="""Analyze the complete structure of the project in directory '{project_directory}':
-    1. List all directories and subdirectories with their purposes
-    2. Identify all file types present (e.g., .py, .js, .json, .md)
-    3. Locate key files (README, configuration files, main entry points)
-    4. Create a hierarchical tree view of the project structure
-    5. Identify the technology stack based on file extensions and config files""",
-    expected_output="""A detailed project structure report including:
-    - Hierarchical directory tree
-    - List of all files grouped by type
-    - Identified technology stack
-    - Key configuration files
-    - Entry points and main modules""",
-    agent=navigator_agent
-)
+        def _run(self, project_directory: str) -> str:
+            """
+            Submits one chat completion per code file as a batch and waits for the results.
+            """
+            try:
+                requests = []
+                paths = list(_iter_code_files(project_directory))
+                for path in paths:
+                    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                        content = f.read()
+                    requests.append(json.dumps({
+                        "custom_id": path,
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": {
+                            "model": self.model,
+                            "temperature": self.temperature,
+                            "messages": [
+                                {"role": "system", "content": ANALYZER_SYSTEM_PROMPT},
+                                {"role": "user", "content": f"File: {path}\n\n{content}"}
+                            ]
+                        }
+                    }))
+                if not requests:
+                    return f"No code files found in {project_directory}"
 
-# Task 2: Code Analysis
-code_analysis_task = Task(
-    description="""Based on the project structure, analyze the codebase in '{project_directory}':
-    1. Examine main code files to understand functionality
-    2. Identify key classes, functions, and modules
-    3. Map dependencies and imports
-    4. Detect design patterns and architectural decisions
-    5. Note any external libraries or frameworks used
-    6. Identify API endpoints if applicable""",
-    expected_output="""A comprehensive code analysis report including:
-    - Main functionalities and features
-    - Key components and their responsibilities
-    - Dependency graph
-    - Used design patterns
-    - External dependencies list
-    - API documentation if applicable""",
-    agent=code_analyzer_agent,
-    context=[structure_analysis_task]
-)
+                client = OpenAI()
+                batch_file = client.files.create(
+                    file=("code_analysis.jsonl", "\n".join(requests).encode('utf-8')),
+                    purpose="batch"
+                )
+                batch = client.batches.create(
+                    input_file_id=batch_file.id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h"
+                )
+
+                # Poll with exponential backoff until the batch reaches a final state
+                delay = 2
+                while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_poll_interval)
+                    batch = client.batches.retrieve(batch.id)
+
+                if batch.status != "completed":
+                    return f"Error analyzing {project_directory}: batch {batch.id} ended with status '{batch.status}'"
+
+                # Successful requests are in the output file, failed ones may be in
+                # either file; every requested path gets an entry
+                results = {path: "Error: no result returned by the batch" for path in paths}
+                for file_id in (batch.output_file_id, batch.error_file_id):
+                    if not file_id:
+                        continue
+                    for line in client.files.content(file_id).text.splitlines():
+                        if line.strip():
+                            record = json.loads(line)
+                            results[record["custom_id"]] = _batch_record_text(record)
+
+                return orjson.dumps(results).decode()
+            except Exception as e:
+                return f"Error analyzing {project_directory}: {e}"
+
+    class ParallelFileReadTool(BaseTool):
+        name: str = "Parallel File Reader"
+        description: str = "Reads several files at once. Pass a list of file paths to get the content of every file in one call."
+
+        def _run(self, file_paths: List[str]) -> str:
+            """
+            Reads the files on a thread pool and merges the results.
+            """
+            try:
+                contents = _run_concurrently(lambda path: file_tool.run(file_path=path), file_paths)
+            except Exception as e:
+                return f"Error reading files {file_paths}: {e}"
+            return "\n\n".join(
+                f"--- File: {path} ---\n{content}" for path, content in zip(file_paths, contents)
+            )
+
+    # Instantiate tools
+    file_tool = CachedFileReadTool()
+    code_analyzer_tool = CodeAnalyzerTool()
+    return {
+        "directory_tool": PrecomputedDirectoryTool(),
+        "file_tool": file_tool,
+        "file_write_tool": FileWriteTool(),
+        "code_analyzer_tool": code_analyzer_tool,
+        "multi_file_analyzer_tool": MultiFileAnalyzerTool(),
+        "batch_code_analyzer_tool": BatchCodeAnalyzerTool(),
+        "parallel_file_tool": ParallelFileReadTool()
+    }
+
+# --- LLM SETUP ---
+
+def build_llms() -> Tuple:
+    """
+    Initializes the LLMs with optimized temperatures.
+    """
+    from crewai import LLM
+
+    # OpenAI caches prompt prefixes >= 1024 tokens automatically, so the static
+    # backstories and task templates must come first and dynamic input last.
+    # Few retries with a timeout keep a failing call from stalling its crew;
+    # the request rate itself is limited through max_rpm on the crews.
+    llm = LLM(model="gpt-4o-mini", temperature=0.7, timeout=30, max_retries=2)
+    analyzer_llm = LLM(model="gpt-4o-mini", temperature=0.3, timeout=30, max_retries=2)  # Lower temp for analysis
+    return llm, analyzer_llm
+
+def build_crews() -> Tuple["Crew", "Crew", "Crew", "Crew"]:
+    """
+    Assembles agents, tasks and crews; returns the structure, code, documentation and review crews.
+    """
+    from crewai import Agent, Task, Crew, Process
+
+    tools = build_tools()
+    directory_tool = tools["directory_tool"]
+    file_tool = tools["file_tool"]
+    file_write_tool = tools["file_write_tool"]
+    code_analyzer_tool = tools["code_analyzer_tool"]
+    multi_file_analyzer_tool = tools["multi_file_analyzer_tool"]
+    batch_code_analyzer_tool = tools["batch_code_analyzer_tool"]
+    parallel_file_tool = tools["parallel_file_tool"]
+    llm, analyzer_llm = build_llms()
+
+    # --- ENHANCED AGENT DEFINITIONS ---
+
+    # 1. Documentation Engineer - Explores, writes and reviews with one shared
+    # system prompt, so the backstory is sent once and cached across all phases.
+    # Each crew gets a fresh instance: an agent keeps the RPM controller of the
+    # first crew it ran in, and that crew stops the controller when it finishes.
+    def make_doc_agent():
+        return Agent(
+            role='Documentation Engineer',
+            goal='Map the project structure, then create and review a comprehensive, well-structured README.md that is informative, accurate and easy to understand.',
+            backstory="""You are a senior developer and technical writer with 10+ years of exploring codebases 
+            and documenting open-source projects. You quickly understand project layouts, entry points and 
+            configuration files, and you provide structured, hierarchical views of project directories. 
+            You know how to structure README files with proper sections including: Project Overview, 
+            Features, Installation, Usage, Project Structure, Configuration, API Documentation, 
+            Contributing Guidelines, and License. You use markdown effectively with code blocks, 
+            tables, and clear formatting, and you review your own documentation for completeness, 
+            technical accuracy and clarity before you consider it done.""",
+            verbose=True,
+            allow_delegation=False,
+            tools=[directory_tool, file_tool, parallel_file_tool, file_write_tool, code_analyzer_tool],
+            llm=llm,
+            max_iter=3
+        )
+
+    structure_agent, writer_agent, reviewer_agent = make_doc_agent(), make_doc_agent(), make_doc_agent()
+
+    # 2. Code Analyzer - New agent for deeper code understanding
+    code_analyzer_agent = Agent(
+        role='Code Analysis Specialist',
+        goal='Analyze code files to understand functionality, dependencies, patterns, and architecture.',
+        backstory="""You are a senior software architect who specializes in reverse-engineering codebases. 
+        You can identify design patterns, understand dependencies, detect code smells, and explain 
+        complex logic in simple terms. You focus on understanding the 'why' behind code structures.""",
+        verbose=True,
+        allow_delegation=False,
+        tools=[file_tool, batch_code_analyzer_tool] if BATCH_MODE else [file_tool, code_analyzer_tool, multi_file_analyzer_tool],
+        llm=analyzer_llm,
+        max_iter=5
+    )
 
-# Task 3: Documentation Creation
-documentation_task = Task(
-    description="""Create a professional README.md for the project in '{project_directory}':
-    Use the structure and code analysis to write comprehensive documentation including:
-    1. Project title and description
-    2. Features and capabilities
-    3. Prerequisites and requirements
-    4. Installation instructions
-    5. Usage examples with code snippets
-    6. Project structure explanation
-    7. Configuration guide
-    8. API documentation (if applicable)
-    9. Contributing guidelines
-    10. License information
+    # --- ENHANCED TASK DEFINITIONS ---
+    # Every description keeps its static checklist first and the per-run
+    # project directory last, so the shared prefix can be served from the
+    # provider's prompt cache.
+
+    # Task 1: Project Structure Analysis
+    structure_analysis_task = Task(
+        description="""Analyze the complete structure of the project directory given below:
+        1. List all directories and subdirectories with their purposes
+        2. Identify all file types present (e.g., .py, .js, .json, .md)
+        3. Locate key files (README, configuration files, main entry points)
+        4. Create a hierarchical tree view of the project structure
+        5. Identify the technology stack based on file extensions and config files
+
+        ---
+        Project directory: {project_directory}""",
+        expected_output="""A detailed project structure report including:
+        - Hierarchical directory tree
+        - List of all files grouped by type
+        - Identified technology stack
+        - Key configuration files
+        - Entry points and main modules""",
+        agent=structure_agent
+    )
+
+    # Task 2: Code Analysis (independent of Task 1, runs concurrently)
+    code_analysis_task = Task(
+        description="""Analyze the codebase in the project directory given below:
+        1. Examine main code files to understand functionality
+        2. Identify key classes, functions, and modules
+        3. Map dependencies and imports
+        4. Detect design patterns and architectural decisions
+        5. Note any external libraries or frameworks used
+        6. Identify API endpoints if applicable
+
+        ---
+        Project directory: {project_directory}""",
+        expected_output="""A comprehensive code analysis report including:
+        - Main functionalities and features
+        - Key components and their responsibilities
+        - Dependency graph
+        - Used design patterns
+        - External dependencies list
+        - API documentation if applicable""",
+        agent=code_analyzer_agent
+    )
+
+    # Task 3: Documentation Creation
+    documentation_task = Task(
+        description="""Create a professional README.md for the project in the directory given below:
+        Use the structure and code analysis to write comprehensive documentation including:
+        1. Project title and description
+        2. Features and capabilities
+        3. Prerequisites and requirements
+        4. Installation instructions
+        5. Usage examples with code snippets
+        6. Project structure explanation
+        7. Configuration guide
+        8. API documentation (if applicable)
+        9. Contributing guidelines
+        10. License information
     
-    Save the README.md in the project root directory.""",
-    expected_output="A complete, well-formatted README.md file saved in the project directory",
-    agent=writer_agent,
-    context=[structure_analysis_task, code_analysis_task]
-)
+        Save the README.md in the project root directory.
 
-# Task 4: Documentation Review and Enhancement
-review_task = Task(
-    description="""Review and enhance the generated README.md in '{project_directory}':
-    1. Check for completeness of all sections
-    2. Verify technical accuracy
-    3. Ensure clarity and readability
-    4. Add missing information if needed
-    5. Format code examples properly
-    6. Add badges if applicable (version, license, etc.)
-    7. Ensure links and references are correct
-    8. Update the file with improvements""",
-    expected_output="An enhanced, production-ready README.md with all improvements applied",
-    agent=reviewer_agent,
-    context=[documentation_task]
-)
+        ---
+        Project directory: {project_directory}""",
+        expected_output="A complete, well-formatted README.md file saved in the project directory",
+        agent=writer_agent,
+        context=[structure_analysis_task, code_analysis_task]
+    )
 
-# --- OPTIMIZED CREW ASSEMBLY ---
-documentation_crew = Crew(
-    agents=[navigator_agent, code_analyzer_agent, writer_agent, reviewer_agent],
-    tasks=[structure_analysis_task, code_analysis_task, documentation_task, review_task],
-    process=Process.sequential,
-    verbose=True,
-    memory=True,  # Enable memory for better context retention
-    full_output=True  # Get complete output from all agents
-)
+    # Task 4: Documentation Review and Enhancement
+    review_task = Task(
+        description="""Review and enhance the generated README.md in the project directory given below:
+        1. Check for completeness of all sections
+        2. Verify technical accuracy
+        3. Ensure clarity and readability
+        4. Add missing information if needed
+        5. Format code examples properly
+        6. Add badges if applicable (version, license, etc.)
+        7. Ensure links and references are correct
+        8. Update the file with improvements
+
+        ---
+        Project directory: {project_directory}""",
+        expected_output="An enhanced, production-ready README.md with all improvements applied",
+        agent=reviewer_agent,
+        context=[documentation_task]
+    )
+
+    # --- OPTIMIZED CREW ASSEMBLY ---
+    # Structure and code analysis only share the read-only project directory,
+    # so they are split into independent crews that are kicked off concurrently.
+    structure_crew = Crew(
+        agents=[structure_agent],
+        tasks=[structure_analysis_task],
+        process=Process.sequential,
+        verbose=True,
+        # No crew memory: results are already threaded via task context, and
+        # memory would embed every step into a local vector store
+        memory=False,
+        full_output=False,
+        max_rpm=_ANALYSIS_MAX_RPM
+    )
+
+    code_crew = Crew(
+        agents=[code_analyzer_agent],
+        tasks=[code_analysis_task],
+        process=Process.sequential,
+        verbose=True,
+        memory=False,
+        full_output=False,
+        max_rpm=_ANALYSIS_MAX_RPM
+    )
+
+    # Writing depends on both analyses and runs afterwards
+    documentation_crew = Crew(
+        agents=[writer_agent],
+        tasks=[documentation_task],
+        process=Process.sequential,
+        verbose=True,
+        memory=False,
+        full_output=False,
+        max_rpm=LLM_MAX_RPM
+    )
+
+    # Review is only kicked off when the draft fails the structural check
+    review_crew = Crew(
+        agents=[reviewer_agent],
+        tasks=[review_task],
+        process=Process.sequential,
+        verbose=True,
+        memory=False,
+        full_output=False,
+        max_rpm=LLM_MAX_RPM
+    )
+
+    return structure_crew, code_crew, documentation_crew, review_crew
+
+def _report_usage(label: str, output, totals: List[int]) -> None:
+    """
+    Prints prompt tokens of a finished crew and how many were served from the
+    prompt cache, and adds them to totals. Agent token counters are cumulative,
+    so the numbers are per crew only because no agent is shared between crews.
+    """
+    usage = getattr(output, "token_usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", 0)
+    cached_prompt_tokens = getattr(usage, "cached_prompt_tokens", 0)
+    totals[0] += prompt_tokens
+    totals[1] += cached_prompt_tokens
+    print(f"  [usage] {label}: prompt_tokens={prompt_tokens} "
+          f"cached_prompt_tokens={cached_prompt_tokens}")
+
+async def _run_pipeline(project_dir: str):
+    """
+    Runs both analysis crews in parallel, then the writing crew, and the
+    review crew unless this run wrote a README with all required sections.
+    """
+    structure_crew, code_crew, documentation_crew, review_crew = build_crews()
+    inputs = {"project_directory": project_dir}
+    structure_result, code_result = await asyncio.gather(
+        structure_crew.kickoff_async(inputs=inputs),
+        code_crew.kickoff_async(inputs=inputs)
+    )
+    totals = [0, 0]
+    _report_usage("structure analysis", structure_result, totals)
+    _report_usage("code analysis", code_result, totals)
+    result = await documentation_crew.kickoff_async(inputs=inputs)
+    _report_usage("documentation", result, totals)
+
+    # Only a README that FileWriteTool wrote in this run can skip the review;
+    # the task answer may just confirm the write and an older file is ignored
+    draft = _WRITTEN_FILES.get(os.path.abspath(os.path.join(project_dir, "README.md")))
+    if draft is not None and not needs_review(draft):
+        print("✓ README.md passed the structural check, skipping review")
+    else:
+        result = await review_crew.kickoff_async(inputs=inputs)
+        _report_usage("review", result, totals)
+    print(f"  [usage] pipeline total: prompt_tokens={totals[0]} cached_prompt_tokens={totals[1]}")
+    return result
 
 # --- ENHANCED EXECUTION ---
 if __name__ == "__main__":
     # Configuration
     PROJECT_DIR = os.getenv("PROJECT_DIR", "test_project")
     
-    # Validate project directory
-    if not os.path.exists(PROJECT_DIR):
+    # Validate project directory; the scan is reused by the directory tool
+    try:
+        project_files = scan_project(PROJECT_DIR)
+    except (FileNotFoundError, NotADirectoryError):
         print(f"ERROR: Directory '{PROJECT_DIR}' not found!")
         print("Please set PROJECT_DIR environment variable or ensure 'test_project' exists.")
         exit(1)
+    except OSError as e:
+        print(f"ERROR: Directory '{PROJECT_DIR}' cannot be read: {e}")
+        print("Please set PROJECT_DIR environment variable or ensure 'test_project' exists.")
+        exit(1)
     
     print(f"✓ Target directory '{PROJECT_DIR}' found.")
-    print(f"  Files found: {len(os.listdir(PROJECT_DIR))}")
+    print(f"  Files found: {len(project_files)} (including subdirectories)")
     
     print("\n" + "="*50)
     print("Starting MADS - Enhanced Documentation System")
@@ -239,21 +710,22 @@ if __name__ == "__main__":
     
     try:
         # Execute the crew with error handling
-        result = documentation_crew.kickoff(
-            inputs={"project_directory": PROJECT_DIR}
-        )
+        result = asyncio.run(_run_pipeline(PROJECT_DIR))
         
         print("\n" + "="*50)
         print("✓ Documentation Generation Complete!")
         print("="*50)
         
-        # Check if README was created
+        # FileWriteTool keeps the content it wrote, so the README does not
+        # have to be read back from disk to count its lines
         readme_path = os.path.join(PROJECT_DIR, "README.md")
-        if os.path.exists(readme_path):
-            with open(readme_path, 'r') as f:
-                lines = f.readlines()
-            print(f"✓ README.md created successfully ({len(lines)} lines)")
+        final_readme = _WRITTEN_FILES.get(os.path.abspath(readme_path))
+        if final_readme is not None and os.path.exists(readme_path):
+            line_count = final_readme.count("\n") + 1
+            print(f"✓ README.md created successfully ({line_count} lines)")
             print(f"✓ Location: {readme_path}")
+        elif os.path.exists(readme_path):
+            print("⚠ README.md was not written during this run, the file on disk is outdated")
         else:
             print("⚠ README.md not found in expected location")
             
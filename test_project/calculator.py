@@ -2,6 +2,8 @@
 A simple calculator module with basic mathematical operations.
 """
 
+from collections import deque
+
 def add(a, b):
     """Add two numbers and return the result."""
     return a + b
@@ -20,29 +22,27 @@ def divide(a, b):
         raise ValueError("Cannot divide by zero")
     return a / b
 
+# Maps operation names to their functions
+_OPS = {"add": add, "subtract": subtract, "multiply": multiply, "divide": divide}
+
 class Calculator:
     """A calculator class for more complex operations."""
     
-    def __init__(self):
-        self.history = []
+    def __init__(self, max_history=10_000):
+        # Raw (operation, a, b, result) tuples; oldest entries drop out first
+        self.history = deque(maxlen=max_history)
     
     def calculate(self, operation, a, b):
         """Perform calculation and store in history."""
-        result = None
-        if operation == "add":
-            result = add(a, b)
-        elif operation == "subtract":
-            result = subtract(a, b)
-        elif operation == "multiply":
-            result = multiply(a, b)
-        elif operation == "divide":
-            result = divide(a, b)
-        else:
-            raise ValueError("Unknown operation")
+        try:
+            func = _OPS[operation]
+        except KeyError:
+            raise ValueError("Unknown operation") from None
+        result = func(a, b)
         
-        self.history.append(f"{operation}({a}, {b}) = {result}")
+        self.history.append((operation, a, b, result))
         return result
     
     def get_history(self):
         """Return calculation history."""
-        return self.history.copy()
+        return [f"{op}({a}, {b}) = {r}" for op, a, b, r in self.history]
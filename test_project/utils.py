@@ -2,31 +2,31 @@
 Utility functions for data processing.
 """
 
-import json
+import numpy as np
+import orjson
 from typing import List, Dict
 
 def load_config(filename: str) -> Dict:
     """Load configuration from JSON file."""
     try:
-        with open(filename, 'r') as f:
-            return json.load(f)
+        with open(filename, 'rb') as f:
+            return orjson.loads(f.read())
     except FileNotFoundError:
         return {}
 
 def process_data(data: List[Dict]) -> List[Dict]:
     """Process a list of data dictionaries."""
-    processed = []
-    for item in data:
-        if 'value' in item and item['value'] > 0:
-            item['processed'] = True
-            processed.append(item)
-    return processed
+    # Vectorized filter: numeric values become an int64/float64 array compared
+    # in one SIMD pass; None or strings fall back to a dtype whose comparison
+    # raises TypeError, just like `value > 0` does
+    values = np.array([item.get('value', 0) for item in data])
+    return [{**data[i], 'processed': True} for i in np.flatnonzero(values > 0).tolist()]
 
 def save_results(data: List[Dict], filename: str) -> bool:
     """Save processed data to JSON file."""
     try:
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         return True
     except Exception as e:
         print(f"Error saving data: {e}")